@@ -1,3 +1,4 @@
+import logging
 import os
 import traceback
 from flask import Flask, jsonify, render_template, request
@@ -6,10 +7,13 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 from src.config import Config
 from src.extensions import oauth
 from src.logger import get_logger
+from src.utils.upload_request import DiskUploadRequest
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    # Spool uploaded files straight to named temp files (no second copy in upload_invoice)
+    app.request_class = DiskUploadRequest
 
     # Enable CORS for all routes
     CORS(app, resources={r"/*": {"origins": "*"}})
@@ -43,11 +47,11 @@ def create_app():
     @app.before_request
     def log_request_info():
         """Log request information for debugging."""
-        logger.info(f"Request: {request.method} {request.path}")
+        logger.info("Request: %s %s", request.method, request.path)
         # Don't access request.form here for multipart requests - it might interfere with file parsing
-        # Only log form data for non-file upload requests
-        if request.path != '/upload' and request.form:
-            logger.debug(f"Form data: {dict(request.form)}")
+        # Only log form data for non-file upload requests, and only parse it when DEBUG is on
+        if request.path != '/upload' and logger.isEnabledFor(logging.DEBUG) and request.form:
+            logger.debug("Form data: %s", dict(request.form))
 
     # 5. Global Error Handlers
     @app.errorhandler(500)
@@ -28,3 +28,9 @@ class Config:
     # If not set, will use the default OCR processor for the project
     DOCUMENT_AI_PROCESSOR_ID = os.environ.get('DOCUMENT_AI_PROCESSOR_ID')
 
+    # Transport for the Document AI client: 'grpc' (default, best for a long-running server)
+    # or 'rest' (faster client start-up for short-lived processes)
+    DOCUMENT_AI_TRANSPORT = os.environ.get('DOCUMENT_AI_TRANSPORT', 'grpc')
+
+    # Number of Document AI OCR requests to run concurrently for one PDF
+    DOCUMENT_AI_OCR_WORKERS = int(os.environ.get('DOCUMENT_AI_OCR_WORKERS', '4'))
@@ -2,13 +2,16 @@
 Helper functions for the BGV Audit application.
 """
 import hashlib
+from functools import lru_cache
 from src.providers.base import BaseProvider
 from src.providers.enum import Provider
 
 
+@lru_cache(maxsize=None)
 def get_provider_instance(provider_name: str) -> BaseProvider:
     """
     Get provider instance based on provider name using match-case pattern matching.
+    Instances are cached per process; providers are reused across requests.
     
     Args:
         provider_name: Name of the provider from Provider enum
@@ -1,9 +1,12 @@
 """
 Logger singleton for centralized logging configuration.
 """
+import atexit
 import os
+import queue
 import sys
 import logging
+import logging.handlers
 
 
 class LoggerSingleton:
@@ -47,13 +50,22 @@ class LoggerSingleton:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        self._logger.addHandler(console_handler)
         
         # Error handler (stderr)
         error_handler = logging.StreamHandler(sys.stderr)
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(formatter)
-        self._logger.addHandler(error_handler)
+        
+        # Request threads only enqueue records; a background listener thread
+        # does the stream writes, so a slow stdout/stderr never blocks a request
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, console_handler, error_handler, respect_handler_level=True
+        )
+        listener.start()
+        # Flush queued records on interpreter shutdown
+        atexit.register(listener.stop)
+        self._logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     @property
     def logger(self):
@@ -7,13 +7,24 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import hashlib
 import re
-import PyPDF2
+import threading
 import pdfplumber
+import pypdfium2 as pdfium
 from src.logger import get_logger
 from src.config import Config
 
 logger = get_logger()
 
+# PDFium is not thread-safe: every pypdfium2 call in the process (providers and the
+# OCR service) must hold this lock. Uploads are processed on several threads at once.
+PDFIUM_LOCK = threading.Lock()
+
+# Description normalization patterns (compiled once, used for every line item)
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+_DESCRIPTION_JUNK_RE = re.compile(r'[^\w\s\-]')
+# Already-clean text: lowercase ASCII words, single spaces and hyphens, word characters at both ends
+_CLEAN_DESCRIPTION_RE = re.compile(r'[a-z0-9_](?:[a-z0-9_ \-]*[a-z0-9_])?')
+
 
 def normalize_description(description: str) -> str:
     """
@@ -31,10 +42,15 @@ def normalize_description(description: str) -> str:
     
     # Convert to lowercase and normalize whitespace
     normalized = description.lower().strip()
-    normalized = re.sub(r'\s+', ' ', normalized)
+    
+    # Quick check: most descriptions are already clean, and the passes below would leave them unchanged
+    if '  ' not in normalized and _CLEAN_DESCRIPTION_RE.fullmatch(normalized):
+        return normalized
+    
+    normalized = _WHITESPACE_RUN_RE.sub(' ', normalized)
     
     # Remove common punctuation and extra characters
-    normalized = re.sub(r'[^\w\s\-]', '', normalized)
+    normalized = _DESCRIPTION_JUNK_RE.sub('', normalized)
     
     # Remove trailing/leading hyphens
     normalized = normalized.strip('-').strip()
@@ -115,6 +131,10 @@ def hash_invoice_id(timestamped_invoice_number: str) -> str:
 
 class ExtractedLineItem:
     """Represents a single line item extracted from an invoice."""
+    # Invoices can carry thousands of items: slots drop the per-instance __dict__
+    # and make the attribute reads in the audit loops slot lookups
+    __slots__ = ('service_date', 'candidate_id', 'candidate_name', 'amount', 'service_description', 'metadata')
+    
     def __init__(
         self, 
         service_date: str,          # Normalized Date
@@ -139,7 +159,7 @@ class ExtractedLineItem:
             'candidate_name': self.candidate_name,
             'amount': self.amount,
             'service_description': self.service_description,
-            'metadata': self.metadata
+            'metadata': dict(self.metadata)  # Metadata may be a shared read-only mapping
         }
 
     @property
@@ -256,6 +276,32 @@ class BaseProvider(ABC):
                 text += page.extract_text() or ""
         return text
     
+    def _get_pdf_page_texts(self, pdf_path: str) -> List[str]:
+        """
+        Helper method to extract the text of every page using pypdfium2.
+        Much faster than pdfplumber for whole-page text dumps; use it when the
+        parser only needs plain text lines (no tables or character positions).
+        Holds PDFIUM_LOCK while the document is open.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            List of page texts, one entry per page
+        """
+        page_texts = []
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_path)
+            try:
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    page_texts.append(textpage.get_text_range())
+                    textpage.close()
+                    page.close()
+            finally:
+                pdf.close()
+        return page_texts
+    
     def _get_pdf_tables(self, pdf_path: str) -> List[List[List[str]]]:
         """
         Helper method to extract tables from PDF using pdfplumber.
@@ -304,19 +350,34 @@ class BaseProvider(ABC):
         if use_ocr:
             # Use Google Cloud Document AI OCR for better accuracy and no memory issues
             logger.info(f"Using Document AI OCR extraction for {self.name} invoice.")
-            from src.services.document_ai_ocr import DocumentAIOCRService
-            ocr_service = DocumentAIOCRService()
+            from src.services.document_ai_ocr import get_ocr_service
+            ocr_service = get_ocr_service()
             all_lines = ocr_service.extract_text_lines(pdf_path)
             logger.info(f"Document AI OCR extracted {len(all_lines)} lines successfully")
         else:
             # Use normal text extraction
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text(layout=True)
-                    if text:
-                        page_lines = [line.strip() for line in text.split('\n') if line.strip()]
-                        all_lines.extend(page_lines)
+                all_lines = self._get_text_lines_from_pdf(pdf)
+        
+        return all_lines
+    
+    def _get_text_lines_from_pdf(self, pdf) -> List[str]:
+        """
+        Extract text lines from an already-opened PDF using normal text extraction.
+        Lets extract() reuse its open pdfplumber handle instead of re-opening the file.
         
+        Args:
+            pdf: Open pdfplumber PDF object
+            
+        Returns:
+            List of text lines extracted from the PDF
+        """
+        all_lines = []
+        for page in pdf.pages:
+            text = page.extract_text(layout=True)
+            if text:
+                page_lines = [line.strip() for line in text.split('\n') if line.strip()]
+                all_lines.extend(page_lines)
         return all_lines
     
     @abstractmethod
@@ -56,7 +56,7 @@ class ConcentraProvider(BaseProvider):
 
             # 2. Extract Line Items
             # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # Check if extraction is complete by comparing sum with grand total
@@ -221,7 +221,7 @@ class ConcentraProvider(BaseProvider):
             
             # Normalize description (first meaningful words for fingerprinting)
             if description:
-                desc_words = description.split()[:5]  # First 5 words sufficient
+                desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                 description = ' '.join(desc_words).strip()
             else:
                 description = "Service"
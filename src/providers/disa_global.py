@@ -141,7 +141,7 @@ class DisaGlobalProvider(BaseProvider):
                         
                         # Normalize description (first meaningful words for fingerprinting)
                         if raw_desc:
-                            desc_words = raw_desc.split()[:5]  # First 5 words sufficient
+                            desc_words = raw_desc.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                             description = ' '.join(desc_words).strip()
                         else:
                             description = "Service"
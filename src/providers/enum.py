@@ -30,10 +30,11 @@ class Provider(str, Enum):
     @classmethod
     def from_string(cls, value: str) -> 'Provider':
         """Get Provider enum from string value."""
-        for provider in cls:
-            if provider.value == value:
-                return provider
-        raise ValueError(f"Unknown provider: {value}")
+        # Enum's value-to-member map gives an O(1) lookup
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f"Unknown provider: {value}") from None
     
     def __str__(self) -> str:
         """Return the provider name as string."""
@@ -54,7 +54,7 @@ class EScreenProvider(BaseProvider):
                 grand_total = float(total_match.group(1).replace(',', ''))
             
             # 3. Extract Line Items (optimized for duplicate detection and total mismatch)
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # Check if extraction is complete by comparing sum with grand total
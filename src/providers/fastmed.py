@@ -166,7 +166,7 @@ class FastMedProvider(BaseProvider):
 
             # --- Step 4: Regex Fallback (if tables failed) ---
             if not line_items:
-                lines = self._get_text_lines(pdf_path, use_ocr=False)
+                lines = self._get_text_lines_from_pdf(pdf)
                 line_items = self._parse_text_lines(lines)
             
             # --- Step 5: Check if extraction is complete by comparing sum with grand total ---
@@ -358,7 +358,7 @@ class FastMedProvider(BaseProvider):
                 
                 # Normalize description (first meaningful words for fingerprinting)
                 full_description = f"{service_code} - {description}" if service_code else description
-                desc_words = full_description.split()[:5]  # First 5 words sufficient
+                desc_words = full_description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                 normalized_description = ' '.join(desc_words).strip()
                 
                 line_items.append(ExtractedLineItem(
@@ -375,7 +375,7 @@ class FastMedProvider(BaseProvider):
                     }
                 ))
             except Exception as e:
-                logger.debug(f"Failed to parse FastMed line: {line}, error: {e}")
+                logger.debug("Failed to parse FastMed line: %s, error: %s", line, e)
                 continue
         
         return line_items
\ No newline at end of file
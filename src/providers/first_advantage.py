@@ -76,7 +76,7 @@ class FirstAdvantageProvider(BaseProvider):
 
             # 2. Extract Line Items
             # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # Check if extraction is complete by comparing sum with grand total
@@ -217,7 +217,7 @@ class FirstAdvantageProvider(BaseProvider):
                     
                     if amount is not None:
                         # Normalize description (first meaningful words for fingerprinting)
-                        desc_words = description.split()[:5]  # First 5 words sufficient
+                        desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                         description = ' '.join(desc_words).strip()
                         
                         # Filter out empty descriptions or subtotal lines
@@ -257,7 +257,7 @@ class FirstAdvantageProvider(BaseProvider):
                             continue
 
                         # Normalize description (first meaningful words for fingerprinting)
-                        desc_words = description.split()[:5]  # First 5 words sufficient
+                        desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                         description = ' '.join(desc_words).strip()
                         
                         if description:  # Only add if we have a description
@@ -295,7 +295,7 @@ class FirstAdvantageProvider(BaseProvider):
                             continue
 
                         # Normalize description (first meaningful words for fingerprinting)
-                        desc_words = description.split()[:5]  # First 5 words sufficient
+                        desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                         description = ' '.join(desc_words).strip()
                         
                         if description:  # Only add if we have a description
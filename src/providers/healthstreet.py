@@ -271,7 +271,9 @@ class HealthStreetProvider(BaseProvider):
                 # Try to find header row
                 header_row = None
                 for i, row in enumerate(table[:3]):  # Check first 3 rows for header
-                    if row and any(cell and ('date' in str(cell).lower() or 'name' in str(cell).lower() or 'service' in str(cell).lower()) for cell in row):
+                    # Lowercase each cell once, not once per keyword
+                    if row and any('date' in text or 'name' in text or 'service' in text
+                                   for text in (str(cell).lower() for cell in row if cell)):
                         header_row = i
                         break
                 
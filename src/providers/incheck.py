@@ -2,13 +2,19 @@
 Provider extractor for InCheck invoices.
 """
 import re
+import sys
 import pdfplumber
+from types import MappingProxyType
 from typing import List
 from .base import BaseProvider, ExtractedInvoice, ExtractedLineItem
 from src.logger import get_logger
 
 logger = get_logger()
 
+# Interned sentinels shared by every line item (avoids per-item string/dict churn)
+_UNKNOWN = sys.intern("UNKNOWN")
+_FN_KEY = sys.intern("file_number")
+
 
 class InCheckProvider(BaseProvider):
     """
@@ -56,7 +62,7 @@ class InCheckProvider(BaseProvider):
             
             # 3. Extract Line Items
             # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # Check if extraction is complete by comparing sum with grand total
@@ -113,6 +119,9 @@ class InCheckProvider(BaseProvider):
         """
         line_items = []
         
+        # One read-only metadata mapping per distinct file number, shared across its line items
+        metadata_cache = {}
+        
         # State variables
         current_date = None
         current_candidate_name = None
@@ -136,7 +145,7 @@ class InCheckProvider(BaseProvider):
                 # If we were already capturing, force close the previous one (Safety Valve)
                 if capturing_candidate and candidate_name_buffer:
                     # Optimized: Use file number or simplified name (name not used for fingerprinting)
-                    current_file_number = "UNKNOWN"
+                    current_file_number = _UNKNOWN
                     current_candidate_name = current_file_number
                 
                 # Reset for new candidate
@@ -174,9 +183,9 @@ class InCheckProvider(BaseProvider):
                         # Extract File # from right side (more flexible pattern)
                         if len(parts) > 1:
                             file_match = re.search(r'(\d+)(?:\s*-\s*)?', parts[1].strip())
-                            current_file_number = file_match.group(1) if file_match else "UNKNOWN"
+                            current_file_number = file_match.group(1) if file_match else _UNKNOWN
                         else:
-                            current_file_number = "UNKNOWN"
+                            current_file_number = _UNKNOWN
                         
                         # Extract actual name from buffer
                         if candidate_name_buffer:
@@ -223,9 +232,9 @@ class InCheckProvider(BaseProvider):
                     # Extract File # (more flexible pattern)
                     if len(parts) > 1:
                         file_match = re.search(r'(\d+)(?:\s*-\s*)?', parts[1].strip())
-                        current_file_number = file_match.group(1) if file_match else "UNKNOWN"
+                        current_file_number = file_match.group(1) if file_match else _UNKNOWN
                     else:
-                        current_file_number = "UNKNOWN"
+                        current_file_number = _UNKNOWN
                     
                     # Extract actual name from buffer
                     if candidate_name_buffer:
@@ -249,7 +258,7 @@ class InCheckProvider(BaseProvider):
                 
                 elif "$" in line or re.search(r'[\$]?[\d,]+\\.\d{2}', line):
                     # Safety Valve: We hit a price line but never found the SSN.
-                    current_file_number = "UNKNOWN"
+                    current_file_number = _UNKNOWN
                     # Extract name from buffer if available
                     if candidate_name_buffer:
                         collected_name = ' '.join(candidate_name_buffer).strip()
@@ -318,7 +327,7 @@ class InCheckProvider(BaseProvider):
                         continue
                     
                     # Normalize description (first meaningful words for fingerprinting)
-                    desc_words = description.split()[:5]  # First 5 words sufficient
+                    desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                     description = ' '.join(desc_words).strip()
                     
                     # Only add if we have a valid description
@@ -331,15 +340,18 @@ class InCheckProvider(BaseProvider):
                                 month, day, year = date_parts
                                 service_date = f"{month.zfill(2)}/{day.zfill(2)}/{year}"
                         
+                        metadata = metadata_cache.get(current_file_number)
+                        if metadata is None:
+                            metadata = MappingProxyType({_FN_KEY: current_file_number})
+                            metadata_cache[current_file_number] = metadata
+                        
                         item = ExtractedLineItem(
                             service_date=service_date,
-                            candidate_id=current_file_number or "UNKNOWN",
+                            candidate_id=current_file_number or _UNKNOWN,
                             candidate_name=current_candidate_name,
                             amount=amount,
                             service_description=description,
-                            metadata={
-                                "file_number": current_file_number
-                            }
+                            metadata=metadata
                         )
                         line_items.append(item)
                     
@@ -81,7 +81,7 @@ class QuestProvider(BaseProvider):
 
             # 2. Extract Line Items
             # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # Check if extraction is complete by comparing sum with grand total
@@ -214,7 +214,7 @@ class QuestProvider(BaseProvider):
                         amount = float(amount_str)
                         
                         # Normalize description (first meaningful words for fingerprinting)
-                        desc_words = description.split()[:5]  # First 5 words sufficient
+                        desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                         description = ' '.join(desc_words).strip()
                         
                         if description:
@@ -252,7 +252,7 @@ class QuestProvider(BaseProvider):
                 amount = float(service_match.group('amount').replace(',', ''))
                 
                 # Normalize description (first meaningful words for fingerprinting)
-                desc_words = description.split()[:5]  # First 5 words sufficient
+                desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                 description = ' '.join(desc_words).strip()
                 
                 # Final validation before adding
@@ -45,7 +45,7 @@ class ReliasProvider(BaseProvider):
             
             # 2. Extract Line Items
             # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
+            lines = self._get_text_lines_from_pdf(pdf)
             line_items = self._parse_text_lines(lines)
             
             # If no line items found, try OCR fallback
@@ -2,13 +2,27 @@
 Provider extractor for Universal invoices.
 """
 import re
-import pdfplumber
 from typing import List
 from .base import BaseProvider, ExtractedInvoice, ExtractedLineItem
 from src.logger import get_logger
 
 logger = get_logger()
 
+# Precompiled patterns (used per line in _parse_text_lines and once per invoice in extract)
+_HEADER_RE = re.compile(r'^(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+-\s+\(Order\s+#\s+(\d+)\)')
+_ITEM_RE = re.compile(r'^(.+?)\s+\$([\d,]+)\.(\d{2})$')
+_INV_RE = re.compile(r'Invoice\s*#?\s*[:.]?\s*([A-Z0-9\-]+)', re.IGNORECASE)
+_TOTAL_RE = re.compile(r'Invoice Total\s+\$([\d,]+)\.(\d{2})')
+
+# Parser states for _parse_text_lines
+_AWAITING_HEADER = 0
+_IN_ORDER = 1
+
+
+def _to_cents(dollars: str, cents: str) -> int:
+    """Convert regex-captured dollar and cent groups (e.g. "1,005", "50") to integer cents."""
+    return int(dollars.replace(',', '')) * 100 + int(cents)
+
 
 class UniversalProvider(BaseProvider):
     """
@@ -30,7 +44,7 @@ class UniversalProvider(BaseProvider):
     
     def identify(self, pdf_path: str) -> bool:
         """Check if this PDF belongs to Universal based on column headers."""
-        text = self._get_pdf_text(pdf_path)
+        text = "\n".join(self._get_pdf_page_texts(pdf_path))
         # The word "Universal" might not be text-searchable, so we look for the unique column headers
         return "Candidate name - order number" in text and "Item Total" in text
     
@@ -39,54 +53,67 @@ class UniversalProvider(BaseProvider):
         Extract invoice data from Universal's PDF format using a State Machine.
         """
         invoice_number = BaseProvider.generate_unknown_invoice_number()  # Universal invoices in this format often lack a top-level invoice #
-        grand_total = 0.0
+        grand_total_cents = 0
         line_items = []
         
-        with pdfplumber.open(pdf_path) as pdf:
-            # 1. Attempt to find Invoice Number (if it exists on page 1)
-            first_page_text = pdf.pages[0].extract_text()
-            inv_match = re.search(r'Invoice\s*#?\s*[:.]?\s*([A-Z0-9\-]+)', first_page_text, re.IGNORECASE)
-            if inv_match:
-                invoice_number = inv_match.group(1)
+        # Plain text is all this format needs, so use pdfium's fast whole-page extraction
+        page_texts = self._get_pdf_page_texts(pdf_path)
+        
+        if not page_texts:
+            raise ValueError("PDF has no pages.")
+        
+        # 1. Attempt to find Invoice Number (if it exists on page 1)
+        first_page_text = page_texts[0]
+        inv_match = _INV_RE.search(first_page_text)
+        if inv_match:
+            invoice_number = inv_match.group(1)
 
-            # 2. Extract Grand Total (usually last page)
-            last_page_text = pdf.pages[-1].extract_text()
-            total_match = re.search(r'Invoice Total\s+\$([\d,]+\.\d{2})', last_page_text)
-            if total_match:
-                grand_total = float(total_match.group(1).replace(',', ''))
-            
-            # 3. Extract Line Items
-            # Try normal text extraction first
-            lines = self._get_text_lines(pdf_path, use_ocr=False)
-            line_items = self._parse_text_lines(lines)
-            
-            # Check if extraction is complete by comparing sum with grand total
-            # If no line items found, or if sum doesn't match grand total (and we have a grand total), try OCR fallback
-            items_sum = sum(item.amount for item in line_items) if line_items else 0.0
-            should_try_ocr = False
-            
-            if not line_items:
-                should_try_ocr = True
-                logger.info("No line items found with text extraction. Attempting OCR fallback for Universal invoice.")
-            elif grand_total > 0.0 and abs(grand_total - items_sum) > 0.01:
-                should_try_ocr = True
-                logger.info(f"Text extraction found {len(line_items)} items with sum ${items_sum:.2f}, but grand total is ${grand_total:.2f}. Attempting OCR fallback for Universal invoice.")
+        # 2. Extract Grand Total (usually last page)
+        last_page_text = page_texts[-1]
+        total_match = _TOTAL_RE.search(last_page_text)
+        if total_match:
+            grand_total_cents = _to_cents(total_match.group(1), total_match.group(2))
+        grand_total = grand_total_cents / 100
+        
+        # 3. Extract Line Items
+        # Try normal text extraction first
+        lines = [line for text in page_texts for line in text.splitlines()]
+        line_items = self._parse_text_lines(lines)
+        
+        # Check if extraction is complete by comparing sum with grand total (exact, in cents)
+        items_cents = sum(round(item.amount * 100) for item in line_items)
+        items_sum = items_cents / 100
+        
+        # Fast path: text extraction is complete, so return without touching any OCR machinery
+        if line_items and (grand_total_cents == 0 or grand_total_cents == items_cents):
+            return ExtractedInvoice(
+                invoice_number=invoice_number,
+                provider_name=self.name,
+                line_items=line_items,
+                # Fallback: Sum line items if footer extraction failed
+                grand_total=grand_total if grand_total != 0.0 else items_sum
+            )
+        
+        # No line items found, or sum doesn't match grand total: try OCR fallback
+        if not line_items:
+            logger.info("No line items found with text extraction. Attempting OCR fallback for Universal invoice.")
+        else:
+            logger.info(f"Text extraction found {len(line_items)} items with sum ${items_sum:.2f}, but grand total is ${grand_total:.2f}. Attempting OCR fallback for Universal invoice.")
+        
+        try:
+            lines = self._get_text_lines(pdf_path, use_ocr=True)
+            ocr_line_items = self._parse_text_lines(lines)
+            ocr_sum = sum(item.amount for item in ocr_line_items) if ocr_line_items else 0.0
             
-            if should_try_ocr:
-                try:
-                    lines = self._get_text_lines(pdf_path, use_ocr=True)
-                    ocr_line_items = self._parse_text_lines(lines)
-                    ocr_sum = sum(item.amount for item in ocr_line_items) if ocr_line_items else 0.0
-                    
-                    # Use OCR results if they're better (more items or closer to grand total)
-                    if not line_items or (grand_total > 0.0 and abs(grand_total - ocr_sum) < abs(grand_total - items_sum)):
-                        line_items = ocr_line_items
-                        logger.info(f"OCR extraction found {len(line_items)} line items with sum ${ocr_sum:.2f}.")
-                    elif line_items:
-                        logger.info(f"OCR extraction found {len(ocr_line_items)} items but text extraction had better match. Using text extraction results.")
-                except Exception as e:
-                    logger.error(f"OCR extraction failed: {str(e)}", exc_info=True)
-                    # Continue with text extraction results if OCR fails
+            # Use OCR results if they're better (more items or closer to grand total)
+            if not line_items or (grand_total > 0.0 and abs(grand_total - ocr_sum) < abs(grand_total - items_sum)):
+                line_items = ocr_line_items
+                logger.info(f"OCR extraction found {len(line_items)} line items with sum ${ocr_sum:.2f}.")
+            elif line_items:
+                logger.info(f"OCR extraction found {len(ocr_line_items)} items but text extraction had better match. Using text extraction results.")
+        except Exception as e:
+            logger.error(f"OCR extraction failed: {str(e)}", exc_info=True)
+            # Continue with text extraction results if OCR fails
         
         if not line_items:
             raise ValueError("Could not extract line items. Format may have changed.")
@@ -116,43 +143,49 @@ class UniversalProvider(BaseProvider):
         line_items = []
         
         # State variables
+        state = _AWAITING_HEADER
         current_date = None
         current_candidate_name = None
         current_order_id = None
         
-        for line in lines:
-            line = line.strip()
+        # Strip and drop blank lines in one C-level pass
+        for line in filter(None, map(str.strip, lines)):
+            # --- Skip Subtotal Lines and Table Headers ---
+            if line.startswith("Subtotal for Order") or "Candidate name - order number" in line:
+                continue
             
             # --- Check for Candidate Header ---
             # Pattern: "<date> <name> - (Order # <id>)"
-            header_match = re.match(r'^(\d{1,2}/\d{1,2}/\d{4})\s+(.+?)\s+-\s+\(Order\s+#\s+(\d+)\)', line)
-            if header_match:
-                current_date = header_match.group(1)
-                current_order_id = header_match.group(3)
-                # Extract actual name from group(2)
-                candidate_name = header_match.group(2).strip()
-                # Use actual name if available, otherwise use order ID
-                current_candidate_name = candidate_name if candidate_name else current_order_id
-                continue
+            # Cheap prefilter: headers start with a digit and mention the order number
+            if line[:1].isdigit() and "(Order" in line:
+                header_match = _HEADER_RE.match(line)
+                if header_match:
+                    current_date = header_match.group(1)
+                    current_order_id = header_match.group(3)
+                    # Extract actual name from group(2)
+                    candidate_name = header_match.group(2).strip()
+                    # Use actual name if available, otherwise use order ID
+                    current_candidate_name = candidate_name if candidate_name else current_order_id
+                    state = _IN_ORDER
+                    continue
 
-            # --- Check for Subtotal Line (Skip) ---
-            if line.startswith("Subtotal for Order"):
+            # --- Check for Line Item ---
+            # Only lines inside an order that carry a dollar amount can be items
+            if state != _IN_ORDER or "$" not in line:
                 continue
-                
-            # --- Check for Table Headers (Skip) ---
-            if "Candidate name - order number" in line:
+            
+            # O(1) shape check: items end in ".dd" (e.g. "$45.00"); skip the regex otherwise
+            if len(line) < 6 or line[-3] != "." or not line[-2:].isdigit():
                 continue
-
-            # --- Check for Line Item ---
+            
             # Pattern: Description followed by Amount at the end
-            item_match = re.match(r'^(.+?)\s+\$([\d,]+\.\d{2})$', line)
+            item_match = _ITEM_RE.match(line)
             
-            if item_match and current_order_id:
+            if item_match:
                 description = item_match.group(1).strip()
-                amount_str = item_match.group(2)
                 
                 try:
-                    amount = float(amount_str.replace(',', ''))
+                    amount = _to_cents(item_match.group(2), item_match.group(3)) / 100
                 except ValueError:
                     continue
                     
@@ -161,7 +194,7 @@ class UniversalProvider(BaseProvider):
                     continue
 
                 # Normalize description (first meaningful words for fingerprinting)
-                desc_words = description.split()[:5]  # First 5 words sufficient
+                desc_words = description.split(None, 5)[:5]  # First 5 words sufficient (stop splitting after the 5th)
                 description = ' '.join(desc_words).strip()
 
                 # Create Line Item
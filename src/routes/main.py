@@ -6,19 +6,48 @@ from src.services.audit import AuditService
 from src.providers.enum import Provider
 from src.helpers import get_provider_instance
 from src.logger import get_logger
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import hashlib
+import logging
 import os
-import tempfile
+import re
+import threading
 
 logger = get_logger()
+# Services are stateless; share one instance across requests
+invoice_service = InvoiceService()
+audit_service = AuditService(invoice_service)
 
 main_bp = Blueprint('main', __name__)
 
 # Configure upload settings
 ALLOWED_EXTENSIONS = {'pdf'}
-# Use NamedTemporaryFile for more reliable cross-platform temp file handling
+_ALLOWED_FILE_RE = re.compile(r'\.(?:' + '|'.join(map(re.escape, ALLOWED_EXTENSIONS)) + r')$', re.IGNORECASE)
+# List of all available providers from enum (fixed for the process lifetime)
+ALL_PROVIDERS = tuple(Provider.list_all())
+
+# (uploaded_by, provider_name, sha256 of PDF) -> Future of the request processing it, so a double
+# submit or client retry of an upload still in flight on this instance waits for that result
+# instead of running it again
+_inflight_uploads = {}
+_inflight_uploads_lock = threading.Lock()
+# How long a duplicate upload waits for the in-flight one before giving up
+INFLIGHT_UPLOAD_WAIT_TIMEOUT = 300  # seconds
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return _ALLOWED_FILE_RE.search(filename) is not None
+
+def _safe_unlink(path):
+    """Remove a temp file if it exists (single unlink, no exists() check)."""
+    if not path:
+        return
+    try:
+        os.unlink(path)
+        logger.info(f"Temporary file cleaned up: {path}")
+    except FileNotFoundError:
+        pass
+    except OSError as cleanup_error:
+        logger.warning(f"Error cleaning up temp file: {cleanup_error}")
 
 @main_bp.route('/')
 def index():
@@ -29,7 +58,6 @@ def index():
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    invoice_service = InvoiceService()
     user_email = session['user']['email']
     
     # Get pagination parameters
@@ -39,12 +67,15 @@ def dashboard():
             page = 1
     except (ValueError, TypeError):
         page = 1
+    # Set by the Next link: resume after the previous page's last invoice instead of an offset scan
+    cursor = request.args.get('cursor') or None
     
     try:
         pagination_data = invoice_service.list_invoices_paginated(
             user_email=user_email,
             page=page,
-            per_page=10
+            per_page=10,
+            cursor=cursor
         )
         invoices = pagination_data['invoices']
     except Exception as e:
@@ -55,16 +86,15 @@ def dashboard():
             'total': 0,
             'page': 1,
             'per_page': 10,
-            'total_pages': 1
+            'total_pages': 1,
+            'has_next': False,
+            'next_cursor': None
         }
     
-    # Get list of all available providers from enum
-    all_providers = Provider.list_all()
-    
     return render_template('dashboard.html', 
                         user=session['user'],
                         invoices=invoices,
-                        providers=all_providers,
+                        providers=ALL_PROVIDERS,
                         pagination=pagination_data)
 
 @main_bp.route('/upload', methods=['POST'])
@@ -74,15 +104,14 @@ def upload_invoice():
     Handle invoice PDF upload and processing.
     Returns JSON response for AJAX requests.
     """
-    # Enhanced logging for debugging file upload issues
-    logger.info(f"Upload request received. Content-Type: {request.content_type}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"Request content length: {request.content_length}")
-    logger.info(f"Request files keys: {list(request.files.keys())}")
-    logger.info(f"Request files dict: {dict(request.files)}")
-    logger.info(f"Request form keys: {list(request.form.keys())}")
-    logger.info(f"Request form dict: {dict(request.form)}")
-    logger.info(f"Request headers: {dict(request.headers)}")
+    # Enhanced logging for debugging file upload issues (only built when DEBUG is enabled)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Upload request received. Content-Type: %s", request.content_type)
+        logger.debug("Request method: %s", request.method)
+        logger.debug("Request content length: %s", request.content_length)
+        logger.debug("Request files: %s", request.files)
+        logger.debug("Request form: %s", request.form)
+        logger.debug("Request headers: %s", request.headers)
     
     # Warn if Content-Type doesn't match (but don't fail - Cloud Run proxy might modify it)
     if not request.content_type or 'multipart/form-data' not in request.content_type:
@@ -100,8 +129,7 @@ def upload_invoice():
     
     # Check if file is in request
     if 'file' not in request.files:
-        logger.warning("'file' key not found in request.files")
-        logger.warning(f"Available keys in request.files: {list(request.files.keys())}")
+        logger.warning("'file' key not found in request.files. Available keys: %s", list(request.files))
         # Try to get the first file if 'file' key doesn't exist
         if request.files:
             first_key = list(request.files.keys())[0]
@@ -141,109 +169,146 @@ def upload_invoice():
             'message': f'Invalid provider selected: {provider_name}'
         }), 400
     
-    if not allowed_file(file.filename):
+    # Validate the sanitized name too. The form parser has already spooled the file to a temp
+    # file (see DiskUploadRequest); a rejected upload's file is removed when the request closes.
+    filename = secure_filename(file.filename)
+    if not allowed_file(file.filename) or not allowed_file(filename):
         return jsonify({
             'success': False,
             'message': 'Invalid file type. Only PDF files are allowed.'
         }), 400
     
-    # Use NamedTemporaryFile for reliable cross-platform temp file handling
-    temp_file = None
     temp_path = None
+    user_email = session['user']['email']
     
     try:
-        # Save uploaded file to a temporary file
-        filename = secure_filename(file.filename)
-        # Use NamedTemporaryFile which handles permissions and cleanup better
-        # delete=False because we need to keep it until processing is done
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-        temp_path = temp_file.name
-        file.save(temp_path)
-        temp_file.close()  # Close the file handle so pdfplumber can open it
+        # The upload was already written to a named temp file while parsing the request
+        # (see DiskUploadRequest); take ownership so it outlives the request
+        temp_path = request.claim_upload(file)
         logger.info(f"File saved to temporary path: {temp_path}")
         
+        pdf_digest = _file_sha256(temp_path)
+        inflight_key = (user_email, provider_name, pdf_digest)
+        with _inflight_uploads_lock:
+            future = _inflight_uploads.get(inflight_key)
+            is_owner = future is None
+            if is_owner:
+                future = _inflight_uploads[inflight_key] = Future()
+        
+        if is_owner:
+            # _process_upload removes the temp file when done
+            upload_path, temp_path = temp_path, None
+            try:
+                result = _process_upload(upload_path, filename, user_email, provider_name)
+            except BaseException as e:
+                # Always resolve the Future so joined requests never wait forever; they get an
+                # ordinary error even if something like SystemExit escaped
+                future.set_exception(e if isinstance(e, Exception) else RuntimeError("Upload processing was interrupted"))
+                raise
+            else:
+                future.set_result(result)
+            finally:
+                with _inflight_uploads_lock:
+                    _inflight_uploads.pop(inflight_key, None)
+        else:
+            # Identical upload already processing for this user: wait for its result
+            logger.info(f"Upload of {filename} joined an identical in-flight upload")
+            _safe_unlink(temp_path)
+            temp_path = None
+        
+        payload, status_code = future.result(timeout=INFLIGHT_UPLOAD_WAIT_TIMEOUT)
+    except FutureTimeoutError:
+        logger.warning(f"Gave up waiting for an identical in-flight upload of {filename}")
+        return jsonify({
+            'success': False,
+            'message': 'An identical upload is still being processed. Please check your dashboard shortly.',
+            'provider_name': provider_name
+        }), 504
+    except Exception as e:
+        logger.error(f"Unexpected error in upload_invoice: {str(e)}", exc_info=True)
+        _safe_unlink(temp_path)
+        return jsonify({
+            'success': False,
+            'message': f'Unexpected error: {str(e)}',
+            'provider_name': provider_name
+        }), 500
+    
+    # Requests that joined an identical upload share this result; never mutate it
+    payload = dict(payload)
+    invoice_id = payload.pop('invoice_id', None)
+    if invoice_id:
+        payload['redirect_url'] = url_for('main.view_invoice', invoice_id=invoice_id)
+    
+    return jsonify(payload), status_code
+
+def _file_sha256(path):
+    """Return the hex SHA-256 digest of a file's contents."""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def _process_upload(temp_path, filename, user_email, provider_name):
+    """
+    Extract, store and audit an uploaded invoice.
+    
+    Returns:
+        Tuple of (response payload dict, HTTP status code)
+    """
+    try:
         # Get provider instance
         provider = get_provider_instance(provider_name)
         if not provider:
-            return jsonify({
+            return {
                 'success': False,
                 'message': f'Provider class not found for: {provider_name}'
-            }), 400
+            }, 400
         
         # Extract invoice data once
         try:
             extracted = provider.extract(temp_path)
         except Exception as e:
             logger.error(f"Error extracting invoice data: {str(e)}", exc_info=True)
-            # Clean up temp file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except Exception as cleanup_error:
-                    logger.warning(f"Error cleaning up temp file: {cleanup_error}")
-            return jsonify({
+            return {
                 'success': False,
                 'message': 'Unable to extract data from the invoice PDF.',
                 'provider_name': provider_name,
                 'is_extraction_error': True
-            }), 400
+            }, 400
         
         # Process invoice
-        invoice_service = InvoiceService()
-        user_email = session['user']['email']
-        
         invoice = invoice_service.process_invoice(
             filename=filename,
             uploaded_by=user_email,
             extracted=extracted
         )
         
-        # Perform audit (reuses extracted data)
-        audit_service = AuditService()
-        audit_report = audit_service.audit_invoice(invoice.id, extracted=extracted)
-        
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-                logger.info(f"Temporary file cleaned up: {temp_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"Error cleaning up temp file: {cleanup_error}")
+        # Perform audit (reuses extracted data and the invoice just written, no re-read)
+        audit_report = audit_service.audit_invoice(invoice.id, extracted=extracted, invoice=invoice)
         
-        return jsonify({
+        return {
             'success': True,
             'message': f'Invoice {invoice.invoice_number} processed successfully. Status: {audit_report.overall_status}',
             'invoice_number': invoice.invoice_number,
             'audit_status': audit_report.overall_status,
-            'redirect_url': url_for('main.view_invoice', invoice_id=invoice.id)
-        }), 200
+            'invoice_id': invoice.id
+        }, 200
     
     except ValueError as e:
         logger.error(f"ValueError in upload_invoice: {str(e)}", exc_info=True)
-        # Clean up temp file on error
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        return jsonify({
+        return {
             'success': False,
             'message': f'Processing error: {str(e)}',
             'provider_name': provider_name
-        }), 400
+        }, 400
     except Exception as e:
         logger.error(f"Unexpected error in upload_invoice: {str(e)}", exc_info=True)
-        # Clean up temp file on error
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        return jsonify({
+        return {
             'success': False,
             'message': f'Unexpected error: {str(e)}',
             'provider_name': provider_name
-        }), 500
+        }, 500
+    finally:
+        # Single cleanup path for the temp file
+        _safe_unlink(temp_path)
 
 @main_bp.route('/invoice/<invoice_id>')
 @login_required
@@ -251,7 +316,6 @@ def view_invoice(invoice_id):
     """
     View invoice details and audit results.
     """
-    invoice_service = InvoiceService()
     invoice = invoice_service.get_by_id(invoice_id)
     
     if not invoice:
@@ -1,10 +1,11 @@
 """
 Service for auditing invoices and detecting discrepancies.
 """
+from operator import attrgetter
 from typing import Dict, List
 from src.models import Invoice
 from src.services.invoice import InvoiceService
-from src.providers.base import ExtractedInvoice
+from src.providers.base import ExtractedInvoice, generate_fingerprint_id
 
 
 class AuditResult:
@@ -32,13 +33,21 @@ class AuditReport:
         self.results = results
     
     def to_dict(self) -> Dict:
+        # Serialize results and count passes in a single pass
+        results = []
+        passed_checks = 0
+        for r in self.results:
+            results.append(r.to_dict())
+            if r.passed:
+                passed_checks += 1
+        total_checks = len(self.results)
         return {
             'invoice_id': self.invoice_id,
             'overall_status': self.overall_status,
-            'results': [r.to_dict() for r in self.results],
-            'total_checks': len(self.results),
-            'passed_checks': sum(1 for r in self.results if r.passed),
-            'failed_checks': sum(1 for r in self.results if not r.passed)
+            'results': results,
+            'total_checks': total_checks,
+            'passed_checks': passed_checks,
+            'failed_checks': total_checks - passed_checks
         }
 
 
@@ -50,32 +59,27 @@ class AuditService:
     2. Internal Duplication Check
     """
     
-    def __init__(self):
-        self.invoice_service = InvoiceService()
+    def __init__(self, invoice_service: InvoiceService = None):
+        # Reuse the caller's InvoiceService when given instead of building another
+        self.invoice_service = invoice_service or InvoiceService()
         self.rounding_tolerance = 0.01  # $0.01 tolerance for rounding differences
     
-    def audit_invoice(self, invoice_id: str, extracted: ExtractedInvoice) -> AuditReport:
+    def audit_invoice(self, invoice_id: str, extracted: ExtractedInvoice, invoice: Invoice = None) -> AuditReport:
         """
         Perform complete audit on an invoice.
         
         Args:
             invoice_id: Invoice document ID (invoice number)
             extracted: Pre-extracted invoice data
+            invoice: The invoice instance if the caller already has it (skips the lookup)
             
         Returns:
             AuditReport object
         """
         # Get invoice
         # Try using invoice_number as doc_id (since that's what we use when creating)
-        invoice = self.invoice_service.get_by_id(invoice_id)
-        if not invoice:
-            # If not found, try to get by invoice_number field as fallback
-            # This handles cases where the document ID might differ
-            try:
-                invoices = self.invoice_service.list_invoices_by_user("")  # Empty to get all
-                invoice = next((inv for inv in invoices if inv.invoice_number == invoice_id), None)
-            except:
-                pass
+        if invoice is None:
+            invoice = self.invoice_service.get_by_id(invoice_id)
         
         if not invoice:
             raise ValueError(f"Invoice {invoice_id} not found. Please ensure the invoice was created successfully.")
@@ -87,7 +91,9 @@ class AuditService:
         results.append(self._check_total_mismatch(extracted))
         
         # 2. Internal Duplication Check
-        results.append(self._check_internal_duplicates(extracted))
+        # Fingerprints are hashed once here so any further checks can reuse them
+        fingerprints = self._fingerprints(extracted.line_items)
+        results.append(self._check_internal_duplicates(extracted, fingerprints))
         
         # Determine overall status
         overall_status = "PASS" if all(r.passed for r in results) else "FAIL"
@@ -102,6 +108,29 @@ class AuditService:
         
         return report
     
+    @staticmethod
+    def _fingerprints(line_items) -> List[str]:
+        """
+        Compute the fingerprint of each line item, hashing each distinct
+        (date, candidate_id, amount, description) combination only once.
+        
+        Args:
+            line_items: List of ExtractedLineItem objects
+            
+        Returns:
+            List of fingerprints, one per line item
+        """
+        # Local to this invoice so nothing is retained between audits
+        fingerprint_cache = {}
+        fingerprints = []
+        for item in line_items:
+            key = (item.service_date, item.candidate_id, item.amount, item.service_description)
+            fingerprint = fingerprint_cache.get(key)
+            if fingerprint is None:
+                fingerprint = fingerprint_cache[key] = generate_fingerprint_id(*key)
+            fingerprints.append(fingerprint)
+        return fingerprints
+    
     def _check_total_mismatch(self, extracted) -> AuditResult:
         """
         Check if the sum of line items matches the grand total.
@@ -112,7 +141,7 @@ class AuditService:
         Returns:
             AuditResult
         """
-        calculated_total = sum(item.amount for item in extracted.line_items)
+        calculated_total = sum(map(attrgetter('amount'), extracted.line_items))
         difference = abs(calculated_total - extracted.grand_total)
         
         if difference <= self.rounding_tolerance:
@@ -134,7 +163,7 @@ class AuditService:
                 }
             )
     
-    def _check_internal_duplicates(self, extracted) -> AuditResult:
+    def _check_internal_duplicates(self, extracted, fingerprints: List[str] = None) -> AuditResult:
         """
         Check for duplicate line items within the same invoice.
         Uses fingerprint based on: date, candidate_id, amount, and normalized description.
@@ -142,16 +171,31 @@ class AuditService:
         
         Args:
             extracted: ExtractedInvoice object
+            fingerprints: Precomputed fingerprints, one per line item (computed if omitted)
             
         Returns:
             AuditResult with duplicate details for display
         """
-        fingerprints = {}
+        if fingerprints is None:
+            fingerprints = self._fingerprints(extracted.line_items)
+        
+        # Common case: all fingerprints unique (one C-level set build, no Python loop)
+        if len(set(fingerprints)) == len(fingerprints):
+            return AuditResult(
+                check_name="Internal Duplication Check",
+                passed=True,
+                message="No internal duplicates found",
+                details={'duplicate_count': 0}
+            )
+        
+        # At least one collision: walk the rows to build the detailed report
+        first_seen = {}
         duplicates = []
         
-        for idx, item in enumerate(extracted.line_items):
-            fingerprint = item.fingerprint
-            if fingerprint in fingerprints:
+        for idx, (item, fingerprint) in enumerate(zip(extracted.line_items, fingerprints)):
+            # Single dict lookup: returns the first row index for this fingerprint
+            first_idx = first_seen.setdefault(fingerprint, idx)
+            if first_idx != idx:
                 # Found duplicate - include details for display in audit report
                 duplicates.append({
                     'row_number': idx + 1,
@@ -160,26 +204,16 @@ class AuditService:
                     'service_description': item.service_description,  # For display
                     'amount': item.amount,
                     'service_date': item.service_date,  # Include date for clarity
-                    'duplicate_of_row': fingerprints[fingerprint] + 1
+                    'duplicate_of_row': first_idx + 1
                 })
-            else:
-                fingerprints[fingerprint] = idx
         
-        if not duplicates:
-            return AuditResult(
-                check_name="Internal Duplication Check",
-                passed=True,
-                message="No internal duplicates found",
-                details={'duplicate_count': 0}
-            )
-        else:
-            return AuditResult(
-                check_name="Internal Duplication Check",
-                passed=False,
-                message=f"Found {len(duplicates)} internal duplicate(s)",
-                details={
-                    'duplicate_count': len(duplicates),
-                    'duplicates': duplicates
-                }
-            )
+        return AuditResult(
+            check_name="Internal Duplication Check",
+            passed=False,
+            message=f"Found {len(duplicates)} internal duplicate(s)",
+            details={
+                'duplicate_count': len(duplicates),
+                'duplicates': duplicates
+            }
+        )
     
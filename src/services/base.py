@@ -1,11 +1,24 @@
-from typing import TypeVar, Generic, Type, Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TypeVar, Generic, Type, Optional, List, Dict, Any, Tuple
 from fireo.models import Model
 from google.cloud import firestore
 from src.config import Config
+from src.logger import get_logger
+
+logger = get_logger()
 
 # Type variable for FireO models
 T = TypeVar('T', bound=Model)
 
+# Firestore rejects a batched write with more than 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+# Max number of batches committed concurrently by the bulk methods
+BULK_COMMIT_WORKERS = 8
+# Value types written to Firestore unchanged by BaseService._model_to_dict
+_FIRESTORE_PASSTHROUGH_TYPES = (str, int, float, bool, dict, list, type(None))
+# Config.DB_ROOT_PATH is fixed for the process; split it once
+_DB_ROOT_PARTS = tuple(Config.DB_ROOT_PATH.split('/'))
+
 
 class BaseService(Generic[T]):
     """
@@ -22,6 +35,10 @@ class BaseService(Generic[T]):
             model_class: The FireO model class this service works with
         """
         self.model_class = model_class
+        # Created lazily on first use and reused (client creation opens a gRPC channel)
+        self._db = None
+        self._collection_ref = None
+        self._model_field_names = None
     
     def get_by_id(self, doc_id: str) -> Optional[T]:
         """
@@ -157,14 +174,23 @@ class BaseService(Generic[T]):
         return self.model_class.db().fetch()
     
     def _get_firestore_client(self):
-        """Get Firestore client instance."""
-        return firestore.Client()
+        """Get Firestore client instance (created once per service)."""
+        if self._db is None:
+            self._db = firestore.Client()
+        return self._db
     
     def _get_collection_ref(self):
         """
         Get the Firestore collection reference with parent path.
         Uses FireO's collection reference which already handles parent paths.
+        The reference is built once per service and reused.
         """
+        if self._collection_ref is None:
+            self._collection_ref = self._build_collection_ref()
+        return self._collection_ref
+    
+    def _build_collection_ref(self):
+        """Construct the collection reference from Config.DB_ROOT_PATH."""
         # Get collection name
         collection_name = getattr(self.model_class.Meta, 'collection_name', None) or self.model_class.collection_name
         
@@ -178,7 +204,7 @@ class BaseService(Generic[T]):
         # So we need to split the parent path and construct properly
         
         # If DB_ROOT_PATH contains slashes, treat as collection/document path
-        parent_parts = Config.DB_ROOT_PATH.split('/')
+        parent_parts = _DB_ROOT_PARTS
         if len(parent_parts) == 2:
             # Format: "workspaces/bgv-audit" -> collection "workspaces", document "bgv-audit"
             parent_collection = db.collection(parent_parts[0]).document(parent_parts[1])
@@ -195,36 +221,172 @@ class BaseService(Generic[T]):
         Convert item dictionary to Firestore-compatible format.
         Handles field type conversions if needed.
         """
-        result = {}
-        for key, value in item.items():
-            if key == 'doc_id':
+        # Convert value to Firestore-compatible types
+        # FireO models handle this automatically, but for direct Firestore writes we need to be explicit.
+        # Pass-through types are kept as is; any other type is converted to string.
+        return {
+            key: value if isinstance(value, _FIRESTORE_PASSTHROUGH_TYPES) else str(value)
+            for key, value in item.items()
+            if key != 'doc_id'
+        }
+    
+    def _commit_writes(self, db, writes: List[Tuple[Any, Dict[str, Any], bool]]) -> None:
+        """
+        Commit (doc_ref, data, merge) writes in batches of at most FIRESTORE_BATCH_LIMIT.
+        Batches are committed concurrently, so a write larger than one batch is not atomic.
+        
+        Args:
+            db: Firestore client
+            writes: List of (document reference, data, merge flag) tuples
+        
+        Raises:
+            Exception: The first batch commit failure (pending batches are cancelled)
+        """
+        chunks = [writes[i:i + FIRESTORE_BATCH_LIMIT] for i in range(0, len(writes), FIRESTORE_BATCH_LIMIT)]
+        
+        def commit(chunk):
+            batch = db.batch()
+            for doc_ref, data, merge in chunk:
+                batch.set(doc_ref, data, merge=merge)
+            # commit() applies the client's default retry policy for transient errors
+            batch.commit()
+        
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                commit(chunk)
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(BULK_COMMIT_WORKERS, len(chunks))) as executor:
+            futures = [executor.submit(commit, chunk) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+    
+    def _merge_duplicate_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge bulk items that share a doc_id (later fields win), keeping first-seen order.
+        Firestore rejects a non-transactional commit with two mutations on the same document.
+        Items without a doc_id are dropped (the bulk methods skip them anyway).
+        
+        Args:
+            items: Bulk input items
+            
+        Returns:
+            One item per doc_id
+        """
+        merged = {}
+        for item in items:
+            doc_id = item.get('doc_id')
+            if not doc_id:
                 continue
-            # Convert value to Firestore-compatible types
-            # FireO models handle this automatically, but for direct Firestore writes we need to be explicit
-            if value is None:
-                result[key] = None
-            elif isinstance(value, (str, int, float, bool)):
-                result[key] = value
-            elif isinstance(value, dict):
-                result[key] = value
-            elif isinstance(value, list):
-                result[key] = value
+            if doc_id in merged:
+                # Build a new dict so callers' items are never mutated
+                merged[doc_id] = {**merged[doc_id], **item}
             else:
-                # For other types, convert to string or handle appropriately
-                result[key] = str(value)
-        return result
+                merged[doc_id] = item
+        
+        if len(merged) < len(items):
+            logger.debug("Bulk write merged %d items into %d documents", len(items), len(merged))
+        return list(merged.values())
+    
+    def _field_names(self) -> frozenset:
+        """Names of the model's FireO fields (computed once per service)."""
+        if self._model_field_names is None:
+            self._model_field_names = frozenset(self.model_class._meta.field_list)
+        return self._model_field_names
+    
+    def _build_instance(self, doc_id: str, data: Dict[str, Any], field_names: frozenset) -> T:
+        """
+        Build a model instance from written data without per-key hasattr() checks.
+        
+        Args:
+            doc_id: Document ID
+            data: Field values that were written
+            field_names: Model field names from _field_names()
+        """
+        instance = self.model_class()
+        instance.id = doc_id
+        for key in field_names.intersection(data):
+            setattr(instance, key, data[key])
+        return instance
+    
+    def _bulk_write(self, items: List[Dict[str, Any]], mode: str, skip_existence_check: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Write items in batches and return the written data keyed by document ID.
+        
+        Args:
+            items: Bulk input items (each with a 'doc_id')
+            mode: 'upsert' (merge into existing documents) or 'create' (new documents only)
+            skip_existence_check: For 'create', skip the check for existing documents
+        
+        Returns:
+            Dict of doc_id -> written data, in input order
+        
+        Raises:
+            ValueError: If mode is 'create' and a document already exists
+                        (only if skip_existence_check=False), or mode is unknown
+        """
+        if mode not in ('upsert', 'create'):
+            raise ValueError(f"Unknown bulk write mode: {mode}")
+        
+        # One write per document; duplicate doc_ids are merged (last write wins per field)
+        items = self._merge_duplicate_items(items)
+        if not items:
+            return {}
+        
+        # Get Firestore client and collection reference
+        db = self._get_firestore_client()
+        collection_ref = self._get_collection_ref()
+        
+        if mode == 'create' and not skip_existence_check:
+            # Batch check for existing documents
+            doc_refs = [collection_ref.document(item['doc_id']) for item in items]
+            existing_docs = db.get_all(doc_refs)
+            existing_ids = [doc.id for doc in existing_docs if doc.exists]
+            
+            if existing_ids:
+                raise ValueError(f"Documents with IDs {existing_ids} already exist. Use bulk_create_or_update() instead.")
+        
+        # A merge write creates missing documents and merges into existing ones,
+        # so upserts need no existence read beforehand
+        merge = mode == 'upsert'
+        
+        # Prepare writes
+        writes = []
+        written_data = {}
+        
+        for item in items:
+            # Merged items always carry a doc_id; _model_to_dict leaves it out of the data
+            doc_id = item['doc_id']
+            
+            # Convert to Firestore-compatible dict
+            data = self._model_to_dict(item)
+            
+            written_data[doc_id] = data
+            writes.append((collection_ref.document(doc_id), data, merge))
+        
+        # Commit in batches of at most FIRESTORE_BATCH_LIMIT
+        self._commit_writes(db, writes)
+        
+        return written_data
     
     def bulk_create_or_update(self, items: List[Dict[str, Any]], skip_existence_check: bool = False) -> List[T]:
         """
         Bulk create or update multiple documents in Firestore using batch writes.
-        This performs a single batch commit, making it much more efficient than individual saves.
+        Writes are committed in batches of up to 500 (committed concurrently),
+        making it much more efficient than individual saves.
+        Items sharing a doc_id are merged first; later values win.
         
         Args:
             items: List of dictionaries, each containing:
                 - 'doc_id': Document ID (required)
                 - Additional key-value pairs for document fields
-            skip_existence_check: If True, skips checking if documents exist
-                                 (assumes all are new). Default False.
+            skip_existence_check: Kept for backward compatibility; no existence
+                                 read is performed (merge writes create or update).
         
         Returns:
             List of created/updated model instances
@@ -236,82 +398,17 @@ class BaseService(Generic[T]):
             ]
             instances = service.bulk_create_or_update(items)
         """
-        if not items:
-            return []
-        
-        # Get Firestore client and collection reference
-        db = self._get_firestore_client()
-        collection_ref = self._get_collection_ref()
-        
-        # Prepare batch
-        batch = db.batch()
-        doc_ids = []
-        instances_data = {}
-        
-        # If checking existence, batch fetch existing documents
-        existing_docs = {}
-        if not skip_existence_check:
-            doc_ids_to_check = [item.get('doc_id') for item in items if item.get('doc_id')]
-            # Batch get documents
-            doc_refs = [collection_ref.document(doc_id) for doc_id in doc_ids_to_check]
-            if doc_refs:
-                existing_docs_raw = db.get_all(doc_refs)
-                for doc in existing_docs_raw:
-                    if doc.exists:
-                        existing_docs[doc.id] = doc.to_dict()
-        
-        # Prepare batch operations
-        for item in items:
-            item_copy = item.copy()
-            doc_id = item_copy.pop('doc_id', None)
-            if not doc_id:
-                continue
-            
-            doc_ids.append(doc_id)
-            doc_ref = collection_ref.document(doc_id)
-            
-            # Convert to Firestore-compatible dict
-            data = self._model_to_dict(item_copy)
-            
-            # Store data for creating instances later
-            instances_data[doc_id] = {
-                'data': data,
-                'is_update': doc_id in existing_docs
-            }
-            
-            # Add to batch (set with merge=False means full document replacement)
-            # For updates, we want to merge with existing data
-            if doc_id in existing_docs:
-                # Update: merge with existing data
-                batch.set(doc_ref, data, merge=True)
-            else:
-                # Create: set new document
-                batch.set(doc_ref, data, merge=False)
-        
-        # Commit batch (single database call)
-        if doc_ids:
-            batch.commit()
+        written_data = self._bulk_write(items, 'upsert')
         
         # Create FireO model instances for return
-        instances = []
-        for doc_id in doc_ids:
-            instance = self.model_class()
-            instance.id = doc_id
-            data = instances_data[doc_id]['data']
-            
-            # Set fields on instance
-            for key, value in data.items():
-                if hasattr(instance, key):
-                    setattr(instance, key, value)
-            
-            instances.append(instance)
-        
-        return instances
+        field_names = self._field_names()
+        return [self._build_instance(doc_id, data, field_names) for doc_id, data in written_data.items()]
     
     def bulk_create(self, items: List[Dict[str, Any]], skip_existence_check: bool = False) -> List[T]:
         """
         Bulk create multiple documents in Firestore using batch writes.
         Raises an error if any document already exists (unless skip_existence_check=True).
+        Items sharing a doc_id are merged first; later values win.
         
         Args:
             items: List of dictionaries, each containing:
@@ -334,58 +431,8 @@ class BaseService(Generic[T]):
             ]
             instances = service.bulk_create(items)
         """
-        if not items:
-            return []
-        
-        # Get Firestore client and collection reference
-        db = self._get_firestore_client()
-        collection_ref = self._get_collection_ref()
-        
-        doc_ids = [item.get('doc_id') for item in items if item.get('doc_id')]
-        
-        if not skip_existence_check:
-            # Batch check for existing documents
-            doc_refs = [collection_ref.document(doc_id) for doc_id in doc_ids]
-            existing_docs = db.get_all(doc_refs)
-            existing_ids = [doc.id for doc in existing_docs if doc.exists]
-            
-            if existing_ids:
-                raise ValueError(f"Documents with IDs {existing_ids} already exist. Use bulk_create_or_update() instead.")
-        
-        # Prepare batch
-        batch = db.batch()
-        instances_data = {}
-        
-        # Add all creates to batch
-        for item in items:
-            item_copy = item.copy()
-            doc_id = item_copy.pop('doc_id', None)
-            if not doc_id:
-                continue
-            
-            doc_ref = collection_ref.document(doc_id)
-            data = self._model_to_dict(item_copy)
-            
-            instances_data[doc_id] = data
-            batch.set(doc_ref, data, merge=False)
-        
-        # Commit batch (single database call)
-        if doc_ids:
-            batch.commit()
+        written_data = self._bulk_write(items, 'create', skip_existence_check)
         
         # Create FireO model instances for return
-        instances = []
-        for doc_id in doc_ids:
-            instance = self.model_class()
-            instance.id = doc_id
-            data = instances_data[doc_id]
-            
-            # Set fields on instance
-            for key, value in data.items():
-                if hasattr(instance, key):
-                    setattr(instance, key, value)
-            
-            instances.append(instance)
-        
-        return instances
-
+        field_names = self._field_names()
+        return [self._build_instance(doc_id, data, field_names) for doc_id, data in written_data.items()]
@@ -3,18 +3,80 @@ Service for Google Cloud Document AI OCR processing.
 Replaces Tesseract OCR to eliminate memory issues and improve accuracy.
 """
 from typing import List
+import io
+import logging
 import os
 import re
-import tempfile
-import PyPDF2
+import statistics
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+import pypdfium2 as pdfium
 from google.cloud import documentai
 from google.api_core.client_options import ClientOptions
 from google.oauth2 import service_account
 from src.config import Config
 from src.logger import get_logger
+from src.providers.base import PDFIUM_LOCK
 
 logger = get_logger()
 
+# Online processing accepts 15 pages per request, or 30 when imageless_mode is set.
+# We only need text back, so imageless mode halves the number of OCR round trips.
+PAGES_PER_REQUEST = 30
+
+# Patterns for the extraction diagnostics and the raw-text fallback
+_DATE_AT_START = re.compile(r'^(\d{2}/\d{2}/\d{4})\s+(.*)')
+_DATE_ANY = re.compile(r'\d{2}/\d{2}/\d{4}')
+_WS_RUN = re.compile(r'\s+')
+
+# Row grouping: elements whose Y centres differ by at most this fraction of the page's
+# median line height share a row; the fixed fallback is used when no heights are known
+ROW_TOLERANCE_RATIO = 0.5
+DEFAULT_ROW_TOLERANCE = 10.0
+
+# Column separator for reconstructed rows: 12 spaces, the typical gap in pdfplumber table output
+_COL_SEP = ' ' * 12
+
+# Clients are thread-safe and own a gRPC channel; share one per (location, transport, credentials)
+# rather than paying channel setup and auth on every DocumentAIOCRService()
+_CLIENT_CACHE = {}
+_client_cache_lock = threading.Lock()
+
+
+def _get_docai_client(location: str, credentials_path: str) -> documentai.DocumentProcessorServiceClient:
+    """
+    Get the shared Document AI client for a location, creating it on first use.
+    
+    Args:
+        location: Document AI location (e.g. 'us')
+        credentials_path: Path to the service account JSON file
+        
+    Returns:
+        DocumentProcessorServiceClient instance
+    """
+    key = (location, Config.DOCUMENT_AI_TRANSPORT, credentials_path)
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        with _client_cache_lock:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                # Load credentials from Document AI specific file
+                credentials = service_account.Credentials.from_service_account_file(credentials_path)
+                logger.info(f"Using Document AI credentials from: {credentials_path}")
+                
+                # Initialize the client with proper endpoint
+                opts = ClientOptions(api_endpoint=f"{location}-documentai.googleapis.com")
+                client = documentai.DocumentProcessorServiceClient(
+                    credentials=credentials,
+                    client_options=opts,
+                    transport=Config.DOCUMENT_AI_TRANSPORT
+                )
+                _CLIENT_CACHE[key] = client
+    return client
+
 
 class DocumentAIOCRService:
     """
@@ -22,6 +84,10 @@ class DocumentAIOCRService:
     This eliminates local memory issues and provides better accuracy for invoices.
     """
     
+    # Project ID resolved once per process (may need a credentials-file parse or a gcloud call)
+    _cached_project_id = None
+    _project_id_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize the Document AI OCR service."""
         self.project_id = self._get_project_id()
@@ -42,13 +108,8 @@ class DocumentAIOCRService:
                 "Please ensure DOCUMENT_AI_CREDENTIALS points to a valid service account JSON file."
             )
         
-        # Load credentials from Document AI specific file
-        credentials = service_account.Credentials.from_service_account_file(documentai_creds_path)
-        logger.info(f"Using Document AI credentials from: {documentai_creds_path}")
-        
-        # Initialize the client with proper endpoint
-        opts = ClientOptions(api_endpoint=f"{self.location}-documentai.googleapis.com")
-        self.client = documentai.DocumentProcessorServiceClient(credentials=credentials, client_options=opts)
+        # Shared per-process client (gRPC channel and auth are set up once)
+        self.client = _get_docai_client(self.location, documentai_creds_path)
         
         # Get processor name (required - matching rules-actions-django pattern)
         if not self.processor_id:
@@ -66,6 +127,23 @@ class DocumentAIOCRService:
         logger.info(f"Document AI initialized: project={self.project_id}, location={self.location}, processor={self.processor_id}")
     
     def _get_project_id(self) -> str:
+        """
+        Get the GCP project ID, resolving it only on first use per process.
+        
+        Returns:
+            Project ID string
+            
+        Raises:
+            ValueError: If project ID cannot be determined
+        """
+        cls = type(self)
+        if cls._cached_project_id is None:
+            with cls._project_id_lock:
+                if cls._cached_project_id is None:
+                    cls._cached_project_id = self._resolve_project_id()
+        return cls._cached_project_id
+    
+    def _resolve_project_id(self) -> str:
         """
         Get the GCP project ID from environment or credentials.
         
@@ -97,7 +175,16 @@ class DocumentAIOCRService:
             except Exception as e:
                 logger.warning(f"Could not read project_id from credentials: {e}")
         
-        # Try to get from gcloud config
+        # Try Application Default Credentials (env, metadata server); resolved in-process
+        try:
+            import google.auth
+            _, project = google.auth.default()
+            if project:
+                return project
+        except Exception as e:
+            logger.debug(f"Could not get project from application default credentials: {e}")
+        
+        # Last resort: gcloud config (forks a subprocess)
         try:
             import subprocess
             result = subprocess.run(
@@ -109,20 +196,22 @@ class DocumentAIOCRService:
             if result.returncode == 0 and result.stdout.strip():
                 return result.stdout.strip()
         except Exception as e:
-            logger.warning(f"Could not get project from gcloud: {e}")
+            logger.debug(f"Could not get project from gcloud: {e}")
         
         raise ValueError(
             "Could not determine GCP project ID. Set DOCUMENT_AI_PROJECT_ID environment variable."
         )
     
     
-    def extract_text_lines(self, pdf_path: str) -> List[str]:
+    def extract_text_lines(self, pdf_path: str, continue_on_error: bool = False) -> List[str]:
         """
         Extract text lines from a PDF using Document AI OCR.
-        Processes PDFs in batches of 15 pages to stay within Document AI limits.
+        Processes PDFs in batches of PAGES_PER_REQUEST pages to stay within Document AI limits.
         
         Args:
             pdf_path: Path to the PDF file
+            continue_on_error: If True, a failing batch is logged and skipped instead of
+                               failing the whole PDF (its pages contribute no lines)
             
         Returns:
             List of text lines extracted from the PDF
@@ -135,152 +224,215 @@ class DocumentAIOCRService:
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         try:
-            # Get total page count
-            with open(pdf_path, "rb") as pdf_file:
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                total_pages = len(pdf_reader.pages)
-            
-            logger.info(f"Processing PDF with Document AI OCR: {pdf_path} ({total_pages} pages)")
-            
-            # Document AI has a limit of 15 pages per request
-            # Process in batches of 15 pages
-            batch_size = 15
-            all_lines = []
-            temp_files = []
-            
+            # Open the PDF once with pdfium (C parser); it supplies the page count and every batch's pages.
+            # PDFium is not thread-safe, so every pdfium call holds PDFIUM_LOCK; only the
+            # Document AI requests run concurrently.
+            with PDFIUM_LOCK:
+                source_pdf = pdfium.PdfDocument(pdf_path)
+                total_pages = len(source_pdf)
             try:
-                for batch_start in range(0, total_pages, batch_size):
-                    batch_end = min(batch_start + batch_size, total_pages)
-                    batch_pages = batch_end - batch_start
-                    
-                    logger.info(f"Processing pages {batch_start + 1}-{batch_end} of {total_pages}")
-                    
-                    # Create a temporary PDF with just this batch of pages
-                    temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-                    temp_files.append(temp_pdf.name)
-                    
-                    # Extract pages for this batch
-                    with open(pdf_path, "rb") as source_file:
-                        source_reader = PyPDF2.PdfReader(source_file)
-                        writer = PyPDF2.PdfWriter()
-                        
-                        for page_num in range(batch_start, batch_end):
-                            writer.add_page(source_reader.pages[page_num])
-                        
-                        writer.write(temp_pdf)
-                    temp_pdf.close()
-                    
-                    # Process this batch with Document AI
-                    with open(temp_pdf.name, "rb") as batch_file:
-                        batch_content = batch_file.read()
-                    
-                    request = documentai.ProcessRequest(
-                        name=self.processor_name,
-                        raw_document=documentai.RawDocument(
-                            content=batch_content,
-                            mime_type="application/pdf"
-                        ),
-                        skip_human_review=True
-                    )
-                    
-                    # Process the batch
-                    result = self.client.process_document(request=request)
-                    document = result.document
-                    
-                    # Extract text lines from this batch
-                    # Document AI breaks table rows into separate lines, but pdfplumber keeps them together
-                    # We need to reconstruct table rows by grouping horizontally aligned text elements
-                    batch_lines = []
-                    
-                    if document.text and document.pages:
-                        # Reconstruct table rows from Document AI's layout information
-                        # Group text elements that are on the same visual row (similar Y coordinates)
-                        # This works best for table-based invoice formats (Scout Logic, Quest, FastMed, etc.)
-                        batch_lines = self._reconstruct_table_rows(document)
-                        
-                        # Fallback: If reconstruction produced very few lines, use simple text splitting
-                        # This handles edge cases where layout-based reconstruction doesn't work well
-                        if len(batch_lines) < 5:
-                            logger.warning(f"Table reconstruction produced only {len(batch_lines)} lines, falling back to simple text extraction")
-                            if document.text:
-                                batch_lines = [line.strip() for line in document.text.split('\n') if line.strip()]
-                        
-                        # Fallback: if reconstruction fails, use full text
-                        if not batch_lines:
-                            raw_lines = document.text.split('\n')
-                            for line in raw_lines:
-                                normalized = re.sub(r'\s+', ' ', line.strip())
-                                if normalized:
-                                    batch_lines.append(normalized)
-                    else:
-                        # Fallback: extract from structured layout if full text not available
-                        for page in document.pages:
-                            for line in page.lines:
-                                line_text = self._layout_to_text(line.layout, document.text)
-                                if line_text and line_text.strip():
-                                    batch_lines.append(line_text.strip())
-                        
-                        # If still no lines, try paragraphs
-                        if not batch_lines:
-                            for page in document.pages:
-                                for paragraph in page.paragraphs:
-                                    para_text = self._layout_to_text(paragraph.layout, document.text)
-                                    if para_text and para_text.strip():
-                                        para_lines = para_text.strip().split('\n')
-                                        batch_lines.extend([line.strip() for line in para_lines if line.strip()])
-                    
-                    all_lines.extend(batch_lines)
-                    logger.info(f"Extracted {len(batch_lines)} lines from pages {batch_start + 1}-{batch_end}")
-                    
-                    # Log sample of first few lines for debugging (use INFO level so it shows in logs)
-                    if batch_lines and batch_start == 0:
-                        sample_lines = batch_lines[:20]
-                        logger.info(f"Sample lines from first batch (first 20):")
-                        for i, line in enumerate(sample_lines, 1):
-                            logger.info(f"  [{i:3d}] {repr(line[:100])}")
-                
-                logger.info(f"Document AI OCR extracted {len(all_lines)} total text lines from {total_pages} pages")
                 
-                # Log samples to help debug parsing issues
-                if all_lines:
-                    logger.info(f"First 10 extracted lines:")
-                    for i, line in enumerate(all_lines[:10], 1):
-                        logger.info(f"  [{i:3d}] {repr(line[:100])}")
-                    
-                    # Check for date patterns that parser expects
-                    date_pattern = re.compile(r'^(\d{2}/\d{2}/\d{4})\s+(.*)')
-                    date_matches = [line for line in all_lines if date_pattern.match(line)]
-                    logger.info(f"Lines matching date pattern (MM/DD/YYYY at start): {len(date_matches)}")
-                    if date_matches:
-                        logger.info(f"Sample date lines (first 5):")
-                        for i, line in enumerate(date_matches[:5], 1):
-                            logger.info(f"  [{i:3d}] {repr(line[:100])}")
-                    else:
-                        logger.warning("⚠️  NO lines match date pattern! This explains why parser finds 0 items.")
-                        # Check if dates exist but not at start
-                        date_anywhere = re.compile(r'\d{2}/\d{2}/\d{4}')
-                        lines_with_dates = [line for line in all_lines if date_anywhere.search(line)]
-                        logger.info(f"Lines containing dates anywhere: {len(lines_with_dates)}")
-                        if lines_with_dates:
-                            logger.info(f"Sample (first 3):")
-                            for i, line in enumerate(lines_with_dates[:3], 1):
-                                logger.info(f"  [{i:3d}] {repr(line[:100])}")
+                logger.info("Processing PDF with Document AI OCR: %s (%d pages)", pdf_path, total_pages)
                 
-                return all_lines
+                # Document AI limits pages per online request (30 in imageless mode)
+                batch_size = PAGES_PER_REQUEST
+                batch_ranges = [
+                    (batch_start, min(batch_start + batch_size, total_pages))
+                    for batch_start in range(0, total_pages, batch_size)
+                ]
                 
-            finally:
-                # Clean up temporary files
-                for temp_file in temp_files:
+                all_lines = []
+                max_workers = max(1, min(Config.DOCUMENT_AI_OCR_WORKERS, len(batch_ranges)))
+                # Split batches held at once (running or queued); bounds memory for large PDFs
+                max_pending = 2 * max_workers
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # (batch_start, batch_end, future) in submission order
+                    pending = deque()
+                    
+                    def collect_oldest():
+                        batch_start, batch_end, future = pending.popleft()
+                        try:
+                            all_lines.extend(future.result())
+                        except Exception as e:
+                            if not continue_on_error:
+                                raise
+                            logger.error("Skipping pages %d-%d after OCR failure: %s", batch_start + 1, batch_end, e)
+                    
                     try:
-                        if os.path.exists(temp_file):
-                            os.remove(temp_file)
-                    except Exception as cleanup_error:
-                        logger.warning(f"Could not clean up temp file {temp_file}: {cleanup_error}")
+                        # Split each batch into an in-memory PDF and send it to Document AI straight
+                        # away, so splitting later batches overlaps the blocking RPCs of earlier ones
+                        for batch_start, batch_end in batch_ranges:
+                            if len(pending) >= max_pending:
+                                collect_oldest()
+                            
+                            with PDFIUM_LOCK:
+                                batch_pdf = pdfium.PdfDocument.new()
+                                try:
+                                    batch_pdf.import_pages(source_pdf, pages=list(range(batch_start, batch_end)))
+                                    buffer = io.BytesIO()
+                                    batch_pdf.save(buffer)
+                                finally:
+                                    batch_pdf.close()
+                            
+                            pending.append((batch_start, batch_end, executor.submit(
+                                self._process_batch, batch_start, batch_end, buffer.getvalue(), total_pages=total_pages
+                            )))
+                        
+                        # Collect in submission order so pages stay in document order
+                        while pending:
+                            collect_oldest()
+                    except BaseException:
+                        # Don't send (and pay for) the batches still queued
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+            finally:
+                with PDFIUM_LOCK:
+                    source_pdf.close()
+            
+            logger.info("Document AI OCR extracted %d total text lines from %d pages", len(all_lines), total_pages)
+            
+            # Log samples to help debug parsing issues (skip the regex scans when INFO is off)
+            if all_lines and logger.isEnabledFor(logging.INFO):
+                logger.info("First 10 extracted lines:")
+                for i, line in enumerate(all_lines[:10], 1):
+                    logger.info("  [%3d] %r", i, line[:100])
+                
+                # Check for date patterns that parser expects
+                date_matches = [line for line in all_lines if _DATE_AT_START.match(line)]
+                logger.info("Lines matching date pattern (MM/DD/YYYY at start): %d", len(date_matches))
+                if date_matches:
+                    logger.info("Sample date lines (first 5):")
+                    for i, line in enumerate(date_matches[:5], 1):
+                        logger.info("  [%3d] %r", i, line[:100])
+                else:
+                    logger.warning("⚠️  NO lines match date pattern! This explains why parser finds 0 items.")
+                    # Check if dates exist but not at start
+                    lines_with_dates = [line for line in all_lines if _DATE_ANY.search(line)]
+                    logger.info("Lines containing dates anywhere: %d", len(lines_with_dates))
+                    if lines_with_dates:
+                        logger.info("Sample (first 3):")
+                        for i, line in enumerate(lines_with_dates[:3], 1):
+                            logger.info("  [%3d] %r", i, line[:100])
+            
+            return all_lines
             
         except Exception as e:
-            logger.error(f"Error during Document AI OCR extraction: {str(e)}", exc_info=True)
+            logger.error("Error during Document AI OCR extraction: %s", e, exc_info=True)
             raise ValueError(f"Document AI OCR extraction failed: {str(e)}")
     
+    def _process_batch(self, batch_start: int, batch_end: int, batch_content: bytes, total_pages: int) -> List[str]:
+        """
+        OCR a single batch PDF with Document AI and return its text lines.
+        
+        Args:
+            batch_start: Zero-based index of the first page in the batch
+            batch_end: Zero-based index one past the last page in the batch
+            batch_content: PDF bytes holding just this batch
+            total_pages: Total page count of the source PDF (for logging)
+            
+        Returns:
+            List of text lines extracted from the batch
+        """
+        logger.info("Processing pages %d-%d of %d", batch_start + 1, batch_end, total_pages)
+        
+        # Process this batch with Document AI
+        request = documentai.ProcessRequest(
+            name=self.processor_name,
+            raw_document=documentai.RawDocument(
+                content=batch_content,
+                mime_type="application/pdf"
+            ),
+            skip_human_review=True,
+            # Don't send page images back; raises the per-request page limit to 30
+            imageless_mode=True
+        )
+        
+        # Process the batch
+        result = self.client.process_document(request=request)
+        document = result.document
+        
+        # Extract text lines from this batch
+        # Document AI breaks table rows into separate lines, but pdfplumber keeps them together
+        # We need to reconstruct table rows by grouping horizontally aligned text elements
+        batch_lines = []
+        
+        if document.text and document.pages:
+            # Reconstruct table rows from Document AI's layout information
+            # Group text elements that are on the same visual row (similar Y coordinates)
+            # This works best for table-based invoice formats (Scout Logic, Quest, FastMed, etc.)
+            # Skip it when the lines carry no usable geometry: every line would be filtered out
+            if self._has_line_geometry(document):
+                batch_lines = self._reconstruct_table_rows(document)
+            
+            # Fallback: If reconstruction produced very few lines, use simple text splitting
+            # This handles edge cases where layout-based reconstruction doesn't work well
+            if len(batch_lines) < 5:
+                logger.warning("Table reconstruction produced only %d lines, falling back to simple text extraction", len(batch_lines))
+                if document.text:
+                    batch_lines = []
+                    for line in document.text.split('\n'):
+                        stripped = line.strip()
+                        if stripped:
+                            batch_lines.append(stripped)
+            
+            # Fallback: if reconstruction fails, use full text
+            if not batch_lines:
+                raw_lines = document.text.split('\n')
+                for line in raw_lines:
+                    normalized = _WS_RUN.sub(' ', line.strip())
+                    if normalized:
+                        batch_lines.append(normalized)
+        else:
+            # Fallback: extract from structured layout if full text not available
+            full_text = document.text
+            for page in document.pages:
+                for line in page.lines:
+                    line_text = self._layout_to_text(line.layout, full_text).strip()
+                    if line_text:
+                        batch_lines.append(line_text)
+            
+            # If still no lines, try paragraphs
+            if not batch_lines:
+                for page in document.pages:
+                    for paragraph in page.paragraphs:
+                        para_text = self._layout_to_text(paragraph.layout, full_text).strip()
+                        if para_text:
+                            para_lines = para_text.split('\n')
+                            for line in para_lines:
+                                stripped = line.strip()
+                                if stripped:
+                                    batch_lines.append(stripped)
+        
+        logger.info("Extracted %d lines from pages %d-%d", len(batch_lines), batch_start + 1, batch_end)
+        
+        # Log sample of first few lines for debugging (use INFO level so it shows in logs)
+        if batch_lines and batch_start == 0 and logger.isEnabledFor(logging.INFO):
+            logger.info("Sample lines from first batch (first 20):")
+            for i, line in enumerate(batch_lines[:20], 1):
+                logger.info("  [%3d] %r", i, line[:100])
+        
+        return batch_lines
+    
+    @staticmethod
+    def _has_line_geometry(document: documentai.Document) -> bool:
+        """
+        Check whether Document AI returned usable line bounding boxes.
+        Some PDFs come back with empty or all-zero vertices on every line, in which case
+        row reconstruction can place nothing. Stops at the first line that has a box, so
+        a blank or cover page at the start of the batch doesn't disable reconstruction.
+        
+        Args:
+            document: Document AI document object
+            
+        Returns:
+            True if any line on any page has a vertex with a positive Y coordinate
+        """
+        return any(
+            line.layout and line.layout.bounding_poly and any(v.y for v in line.layout.bounding_poly.vertices)
+            for page in document.pages
+            for line in page.lines
+        )
+    
     def _reconstruct_table_rows(self, document: documentai.Document) -> List[str]:
         """
         Reconstruct table rows from Document AI layout by grouping horizontally aligned text.
@@ -297,77 +449,107 @@ class DocumentAIOCRService:
             List of reconstructed text lines
         """
         reconstructed_lines = []
+        # Read the full text once; line text is sliced from it by text-anchor offsets
+        full_text = document.text
+        text_len = len(full_text)
         
         for page in document.pages:
             # Collect all text elements with their bounding boxes
             text_elements = []
+            line_heights = []
             
             # Get all lines from the page
             for line in page.lines:
-                if line.layout and line.layout.bounding_poly:
-                    text = self._layout_to_text(line.layout, document.text)
-                    if text and text.strip():
-                        # Get Y coordinate (top of bounding box) for grouping
-                        vertices = line.layout.bounding_poly.vertices
-                        if vertices and len(vertices) > 0:
-                            # Get valid Y coordinates (filter out None/0)
-                            y_coords = [v.y for v in vertices if v.y is not None and v.y > 0]
-                            x_coords = [v.x for v in vertices if v.x is not None and v.x >= 0]
-                            
-                            if y_coords and x_coords:
-                                # Use average Y coordinate for grouping, min X for sorting
-                                y_coord = sum(y_coords) / len(y_coords)
-                                x_coord = min(x_coords)
-                                text_elements.append({
-                                    'text': text.strip(),
-                                    'x': x_coord,
-                                    'y': y_coord
-                                })
+                layout = line.layout
+                if not (layout and layout.bounding_poly and layout.text_anchor):
+                    continue
+                
+                # Get Y coordinate (top of bounding box) for grouping; check the geometry
+                # first so text is only sliced out for lines that can be placed on a row
+                vertices = layout.bounding_poly.vertices
+                if not vertices:
+                    continue
+                # One pass over the vertices: valid Y (not None/0) and X (not None/negative)
+                y_sum = y_count = 0
+                y_min = y_max = x_min = None
+                for v in vertices:
+                    y = v.y
+                    if y is not None and y > 0:
+                        y_sum += y
+                        y_count += 1
+                        if y_min is None or y < y_min:
+                            y_min = y
+                        if y_max is None or y > y_max:
+                            y_max = y
+                    x = v.x
+                    if x is not None and x >= 0 and (x_min is None or x < x_min):
+                        x_min = x
+                if not y_count or x_min is None:
+                    continue
+                
+                # Inline of _layout_to_text: one slice per segment, no per-line method call
+                segments = layout.text_anchor.text_segments
+                if len(segments) == 1:
+                    segment = segments[0]
+                    text = full_text[int(segment.start_index or 0):int(segment.end_index or text_len)].strip()
+                else:
+                    text = "".join([
+                        full_text[int(segment.start_index or 0):int(segment.end_index or text_len)]
+                        for segment in segments
+                    ]).strip()
+                if not text:
+                    continue
+                
+                # Use average Y coordinate for grouping, min X for sorting;
+                # (y, x, text) tuples sort top-to-bottom, then left-to-right
+                text_elements.append((y_sum / y_count, x_min, text))
+                if y_count > 1:
+                    line_heights.append(y_max - y_min)
             
             if not text_elements:
                 continue
             
             # Sort by Y coordinate (top to bottom), then by X coordinate (left to right)
-            text_elements.sort(key=lambda e: (e['y'], e['x']))
+            text_elements.sort()
             
             # Group elements that are on the same row (similar Y coordinates)
-            # Tolerance: elements within 10 pixels vertically are considered same row
-            # This tolerance works for most invoice table layouts
-            tolerance = 10.0
+            # Tolerance scales with the page's text height, so high- and low-DPI scans
+            # group the same way; fall back to 10 pixels when no line heights are known
+            median_height = statistics.median(line_heights) if line_heights else 0
+            tolerance = median_height * ROW_TOLERANCE_RATIO if median_height > 0 else DEFAULT_ROW_TOLERANCE
             current_row = []
             current_y = None
+            row_y_sum = 0.0
             
             for element in text_elements:
-                if current_y is None or abs(element['y'] - current_y) <= tolerance:
+                y = element[0]
+                if current_y is None or abs(y - current_y) <= tolerance:
                     # Same row - add to current row
                     current_row.append(element)
-                    if current_y is None:
-                        current_y = element['y']
-                    else:
-                        # Update to average Y of row for better grouping
-                        current_y = sum(e['y'] for e in current_row) / len(current_row)
+                    # Track the average Y of the row for better grouping (running sum, not a re-sum)
+                    row_y_sum += y
+                    current_y = row_y_sum / len(current_row)
                 else:
                     # New row - process previous row and start new one
                     if current_row:
                         # Sort row elements by X coordinate (left to right)
-                        current_row.sort(key=lambda e: e['x'])
+                        current_row.sort(key=itemgetter(1))
                         # Join with multiple spaces to match pdfplumber format
-                        # Use 12 spaces (typical spacing in pdfplumber output for table columns)
-                        row_text = '            '.join(e['text'] for e in current_row)
+                        row_text = _COL_SEP.join([e[2] for e in current_row])
                         reconstructed_lines.append(row_text)
                     current_row = [element]
-                    current_y = element['y']
+                    current_y = row_y_sum = y
             
             # Don't forget the last row
             if current_row:
-                current_row.sort(key=lambda e: e['x'])
-                row_text = '            '.join(e['text'] for e in current_row)
+                current_row.sort(key=itemgetter(1))
+                row_text = _COL_SEP.join([e[2] for e in current_row])
                 reconstructed_lines.append(row_text)
         
         # If reconstruction produced suspiciously few or many lines, log a warning
         # but still return the result (parsers will filter what they need)
         if len(reconstructed_lines) < 10:
-            logger.warning(f"Table reconstruction produced only {len(reconstructed_lines)} lines - may need adjustment")
+            logger.warning("Table reconstruction produced only %d lines - may need adjustment", len(reconstructed_lines))
         
         return reconstructed_lines
     
@@ -382,15 +564,31 @@ class DocumentAIOCRService:
         Returns:
             Text string for the layout
         """
-        if not layout.text_anchor or not layout.text_anchor.text_segments:
+        if not layout.text_anchor:
+            return ""
+        segments = layout.text_anchor.text_segments
+        if not segments:
             return ""
         
-        # Extract text segments
-        text_parts = []
-        for segment in layout.text_anchor.text_segments:
-            start_index = int(segment.start_index) if segment.start_index else 0
-            end_index = int(segment.end_index) if segment.end_index else len(full_text)
-            text_parts.append(full_text[start_index:end_index])
-        
-        return "".join(text_parts)
+        # Extract text segments (unset indices default to the start/end of the text)
+        text_len = len(full_text)
+        if len(segments) == 1:
+            segment = segments[0]
+            return full_text[int(segment.start_index or 0):int(segment.end_index or text_len)]
+        return "".join([
+            full_text[int(segment.start_index or 0):int(segment.end_index or text_len)]
+            for segment in segments
+        ])
+
 
+@lru_cache(maxsize=1)
+def get_ocr_service() -> DocumentAIOCRService:
+    """
+    Get the shared DocumentAIOCRService instance, creating it on first use.
+    The service holds no per-request state, so one instance serves every OCR call.
+    Configuration errors are raised (and not cached) until the service can be built.
+    
+    Returns:
+        DocumentAIOCRService instance
+    """
+    return DocumentAIOCRService()
@@ -1,7 +1,10 @@
 """
 Service for invoice processing and management.
 """
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, Optional
+import threading
+import time
 from src.models import Invoice
 from src.services.base import BaseService
 from src.providers.base import ExtractedInvoice, append_timestamp_to_invoice_number, hash_invoice_id
@@ -10,6 +13,21 @@ from src.logger import get_logger
 
 logger = get_logger()
 
+# A user's invoice count is only needed for the dashboard's page numbers; cache it briefly
+INVOICE_COUNT_CACHE_TTL = 60  # seconds
+
+# Invoices fetched per query when listing a user's invoices
+INVOICE_LIST_PAGE_SIZE = 50
+
+
+@lru_cache(maxsize=1024)
+def _user_invoices_query(user_email: str):
+    """
+    Base query for a user's invoices, built once per user.
+    FireO queries are immutable (filter/order/limit return copies), so sharing one is safe.
+    """
+    return Invoice.db().filter('uploaded_by', '==', user_email)
+
 
 class InvoiceService(BaseService[Invoice]):
     """
@@ -18,6 +36,11 @@ class InvoiceService(BaseService[Invoice]):
     
     def __init__(self):
         super().__init__(Invoice)
+        # user_email -> (expires_at, total); dropped when that user uploads an invoice
+        self._count_cache = {}
+        # user_email -> number of uploads seen, so a count that raced an upload is not cached
+        self._count_generation = {}
+        self._count_cache_lock = threading.Lock()
     
     def process_invoice(self, filename: str, uploaded_by: str, extracted: ExtractedInvoice) -> Invoice:
         """
@@ -34,6 +57,9 @@ class InvoiceService(BaseService[Invoice]):
         Raises:
             ValueError: If processing fails
         """
+        # Fail before any Firestore work if extraction produced nothing
+        if extracted is None:
+            raise ValueError("No extracted invoice data to process.")
         
         # Store raw invoice number (convert "__" to "_" if not found)
         raw_invoice_number = extracted.invoice_number if extracted.invoice_number != "__" else "_"
@@ -54,6 +80,11 @@ class InvoiceService(BaseService[Invoice]):
             audit_status="PENDING"
         )
         
+        # The user's invoice count changed with this write
+        with self._count_cache_lock:
+            self._count_cache.pop(uploaded_by, None)
+            self._count_generation[uploaded_by] = self._count_generation.get(uploaded_by, 0) + 1
+        
         return invoice
     
     def get_invoice_by_number(self, invoice_number: str) -> Optional[Invoice]:
@@ -68,20 +99,58 @@ class InvoiceService(BaseService[Invoice]):
         """
         return self.get_by_id(invoice_number)
     
-    def list_invoices_by_user(self, user_email: str) -> List[Invoice]:
+    def list_invoices_by_user(self, user_email: str, page_size: int = INVOICE_LIST_PAGE_SIZE) -> Iterator[Invoice]:
         """
-        List all invoices uploaded by a specific user.
+        List the invoices uploaded by a specific user, newest first.
+        Invoices are streamed page_size at a time, each page resuming after the last
+        document of the previous one, so memory stays bounded for heavy uploaders.
+        Wrap the result in list() to materialize it.
+        
+        Args:
+            user_email: User's email address
+            page_size: Number of invoices fetched per query
+            
+        Yields:
+            Invoice instances
+        """
+        query = _user_invoices_query(user_email).order('-upload_date').limit(page_size)
+        cursor = None
+        while True:
+            page_query = query.start_after(key=cursor) if cursor else query
+            page = list(page_query.fetch())
+            yield from page
+            # A short page means the end of the results
+            if len(page) < page_size:
+                return
+            cursor = page[-1].key
+    
+    def count_invoices_by_user(self, user_email: str) -> int:
+        """
+        Count the invoices uploaded by a user.
+        Counts are cached for INVOICE_COUNT_CACHE_TTL seconds and refreshed when the user uploads
+        through this instance, so they may lag behind; use them for display only.
         
         Args:
             user_email: User's email address
             
         Returns:
-            List of Invoice instances
+            Number of invoices
         """
-        # FireO query example - adjust based on your FireO version
-        return Invoice.db().filter('uploaded_by', '==', user_email).fetch()
+        now = time.monotonic()
+        with self._count_cache_lock:
+            cached = self._count_cache.get(user_email)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+            generation = self._count_generation.get(user_email, 0)
+        
+        total = _user_invoices_query(user_email).count()
+        with self._count_cache_lock:
+            # An upload finished while counting: the result may predate it, so don't cache it
+            if self._count_generation.get(user_email, 0) == generation:
+                self._count_cache[user_email] = (now + INVOICE_COUNT_CACHE_TTL, total)
+        return total
     
-    def list_invoices_paginated(self, user_email: str, page: int = 1, per_page: int = 10) -> Dict:
+    def list_invoices_paginated(self, user_email: str, page: int = 1, per_page: int = 10, cursor: Optional[str] = None) -> Dict:
         """
         List invoices with pagination using the reusable Paginator utility.
         
@@ -89,16 +158,27 @@ class InvoiceService(BaseService[Invoice]):
             user_email: User's email address
             page: Page number (1-indexed)
             per_page: Number of records per page
+            cursor: Optional 'next_cursor' of the previous page (resumes after it, no offset scan)
             
         Returns:
-            Dictionary with 'invoices' (list), 'total' (int), 'page' (int), 'per_page' (int), 'total_pages' (int)
+            Dictionary with 'invoices' (list), 'total' (int), 'page' (int), 'per_page' (int), 'total_pages' (int),
+            'has_next' (bool), 'next_cursor' (str or None)
         """
         # Base query: filter by user
-        query = Invoice.db().filter('uploaded_by', '==', user_email)
+        query = _user_invoices_query(user_email)
         # Order by upload date descending
         query = query.order('-upload_date')
         # Use Paginator utility
-        pagination_result = Paginator.paginate(query, page=page, per_page=per_page)
+        total = self.count_invoices_by_user(user_email)
+        pagination_result = None
+        if cursor:
+            try:
+                pagination_result = Paginator.paginate(query, page=page, per_page=per_page, cursor=cursor, total=total)
+            except Exception as e:
+                # Stale or malformed cursor (e.g. the invoice was deleted): fall back to the offset path
+                logger.warning("Ignoring unusable pagination cursor: %s", e)
+        if pagination_result is None:
+            pagination_result = Paginator.paginate(query, page=page, per_page=per_page, total=total)
         
         # Map to expected format (using 'invoices' instead of 'items')
         return {
@@ -106,6 +186,8 @@ class InvoiceService(BaseService[Invoice]):
             'total': pagination_result['total'],
             'page': pagination_result['page'],
             'per_page': pagination_result['per_page'],
-            'total_pages': pagination_result['total_pages']
+            'total_pages': pagination_result['total_pages'],
+            'has_next': pagination_result['has_next'],
+            'next_cursor': pagination_result['next_cursor']
         }
 
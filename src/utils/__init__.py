@@ -2,6 +2,7 @@
 Utility modules for the application.
 """
 from .paginator import Paginator
+from .upload_request import DiskUploadRequest
 
-__all__ = ['Paginator']
+__all__ = ['Paginator', 'DiskUploadRequest']
 
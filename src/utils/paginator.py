@@ -11,7 +11,8 @@ class Paginator:
     """
     
     @staticmethod
-    def paginate(query, page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    def paginate(query, page: int = 1, per_page: int = 10, cursor: Optional[str] = None,
+                 total: Optional[int] = None) -> Dict[str, Any]:
         """
         Paginate a FireO query.
         
@@ -19,6 +20,10 @@ class Paginator:
             query: FireO query object (e.g., from Model.db().filter(...))
             page: Page number (1-indexed)
             per_page: Number of records per page
+            cursor: Optional 'next_cursor' from the previous page's result. When given,
+                    the page starts right after that document instead of at an offset.
+            total: Total item count if the caller already knows it (skips the count query).
+                   It may be stale: it is only used for display, never to decide has_next.
             
         Returns:
             Dictionary with:
@@ -29,22 +34,38 @@ class Paginator:
                 - 'total_pages': Total number of pages
                 - 'has_prev': Boolean indicating if previous page exists
                 - 'has_next': Boolean indicating if next page exists
+                - 'next_cursor': Key of the last item when a next page exists, else None
         """
         # Validate page number
         if page < 1:
             page = 1
         
-        # Get total count without fetching all records
-        total = query.count()
+        # Get total count without fetching all records (a billed aggregation round trip)
+        if total is None:
+            total = query.count()
         
-        # 2. Calculate Offset
-        offset = (page - 1) * per_page
+        if cursor:
+            # 2. Resume after the previous page's last document (keyset): Firestore
+            # reads only this page, however deep it is
+            page_query = query.start_after(key=cursor)
+        else:
+            # 2. Calculate Offset
+            # Native Firestore offset still reads (and bills) every skipped document
+            offset = (page - 1) * per_page
+            page_query = query.offset(offset)
         
-        # 3. Fetch only the needed page using native Firestore offset
-        # This is much better than slicing a list in Python, but still costs reads.
-        items = list(query.offset(offset).limit(per_page).fetch())
+        # 3. Fetch only the needed page, plus one sentinel item that tells whether another page exists
+        items = list(page_query.limit(per_page + 1).fetch())
+        has_next = len(items) > per_page
+        items = items[:per_page]
         
+        if items:
+            # A cached total can lag behind recent uploads; never report less than this page shows
+            total = max(total, (page - 1) * per_page + len(items))
         total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+        if has_next:
+            # The sentinel proved another page exists, whatever the total says
+            total_pages = max(total_pages, page + 1)
         
         return {
             'items': items,
@@ -52,6 +73,7 @@ class Paginator:
             'page': page,
             'per_page': per_page,
             'total_pages': total_pages,
-            'has_next': page < total_pages,
-            'has_prev': page > 1
+            'has_next': has_next,
+            'has_prev': page > 1,
+            'next_cursor': items[-1].key if has_next and items else None
         }
\ No newline at end of file
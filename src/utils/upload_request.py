@@ -0,0 +1,55 @@
+"""
+Flask request class that writes uploaded files straight to disk.
+"""
+import os
+import tempfile
+from typing import List
+from flask import Request
+from werkzeug.datastructures import FileStorage
+
+
+class DiskUploadRequest(Request):
+    """
+    Request that spools every multipart file part into a named temp file.
+    
+    Werkzeug's default keeps small parts in memory and larger ones in an
+    anonymous SpooledTemporaryFile, so handlers that need a path copy the
+    upload a second time. Here the parser writes each part directly to a
+    named file; a handler takes ownership with claim_upload() and any
+    unclaimed files are removed when the request closes.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._upload_paths: List[str] = []
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        """Called by the form parser for each file part."""
+        stream = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+        self._upload_paths.append(stream.name)
+        return stream
+    
+    def claim_upload(self, file: FileStorage) -> str:
+        """
+        Take ownership of an uploaded file's temp file.
+        
+        Args:
+            file: FileStorage from request.files
+            
+        Returns:
+            Path of the temp file; the caller is responsible for deleting it
+        """
+        path = file.stream.name
+        file.stream.close()
+        self._upload_paths.remove(path)
+        return path
+    
+    def close(self) -> None:
+        """Close the request and delete any upload temp files that were not claimed."""
+        super().close()
+        for path in self._upload_paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._upload_paths = []